@@ -1,59 +1,90 @@
+from sqlalchemy import delete, insert, select
 from sqlalchemy.orm import Session
-from backend.models import Document, Audio, Shape
+from backend.models import Document, Audio, Page, Shape
+
+# Keys stored as real Shape columns; everything else goes into `properties`
+_SHAPE_COLUMNS = frozenset(("id", "kind", "x", "y", "width", "height", "rotate"))
+
+# Field order of the columnar shape lists in get_document_data
+_SHAPE_FIELDS = ("id", "kind", "x", "y", "width", "height", "rotate", "properties")
+
+def _shape_to_dict(shape) -> dict:
+    """
+    Flattens a shape's columns and properties JSON into the dict the frontend expects.
+    Built as a single dict display, columns win over any property with the same key.
+    """
+    return {
+        **(shape.properties or {}),
+        "id": shape.id,
+        "kind": shape.kind,
+        "x": shape.x,
+        "y": shape.y,
+        "width": shape.width,
+        "height": shape.height,
+        "rotate": shape.rotate,
+    }
+
+def _shape_columns(rows: list[tuple]) -> dict[str, tuple]:
+    """Transposes shape rows (in _SHAPE_FIELDS order) into one tuple per field."""
+    columns = list(zip(*rows)) or [()] * len(_SHAPE_FIELDS)
+    return dict(zip(_SHAPE_FIELDS, columns))
 
 def get_document_data(db: Session, document_id: str) -> tuple[dict | None, list[bytes]]:
     """
     Fetches document data and returns a tuple:
     1. The document structure (JSON-serializable dict), with images having their URLs.
+       Each page's shapes are columnar: one list per field, index i across
+       all lists being shape i, which the frontend turns back into objects.
     2. An empty list (no longer preloading images to binary).
     """
-    document = db.query(Document).filter(Document.id == document_id).first()
-    if not document:
+    # Read-only payload: select plain rows instead of materializing ORM
+    # objects, one flat query per level, and group shapes by page in Python.
+    if db.scalar(select(Document.id).where(Document.id == document_id)) is None:
         return None, []
-    
-    pages_data = []
 
-    for page in document.pages:
-        shapes_data = []
-        for shape in page.shapes:
-            # Merge explicit columns and properties JSON
-            shape_dict = {
-                "id": shape.id,
-                "kind": shape.kind,
-                "x": shape.x,
-                "y": shape.y,
-                "width": shape.width,
-                "height": shape.height,
-                "rotate": shape.rotate,
-            }
-            if shape.properties:
-                shape_dict.update(shape.properties)
-            
-            # Images now keep their URLs - frontend will load them directly
+    pages = db.execute(
+        select(Page.id, Page.width, Page.height, Page.background)
+        .where(Page.document_id == document_id)
+    ).all()
 
-            shapes_data.append(shape_dict)
+    shapes = db.execute(
+        select(
+            Shape.page_id, Shape.id, Shape.kind, Shape.x, Shape.y,
+            Shape.width, Shape.height, Shape.rotate, Shape.properties,
+        )
+        .join(Page, Shape.page_id == Page.id)
+        .where(Page.document_id == document_id)
+        .order_by(Shape.id)
+    ).all()
+
+    # Images keep their URLs - frontend will load them directly
+    shapes_by_page: dict[str, list[tuple]] = {page.id: [] for page in pages}
+    for shape in shapes:
+        shapes_by_page[shape.page_id].append(shape[1:])
 
-        pages_data.append({
-            "id": page.id,
-            "width": page.width,
-            "height": page.height,
-            "background": page.background,
-            "shapes": shapes_data
-        })
-        
     doc_structure = {
-        "id": document.id,
-        "pages": pages_data
+        "id": document_id,
+        "pages": [
+            {
+                "id": page.id,
+                "width": page.width,
+                "height": page.height,
+                "background": page.background,
+                "shapes": _shape_columns(shapes_by_page[page.id])
+            }
+            for page in pages
+        ]
     }
-    
+
     return doc_structure, []
 
 def get_audio_data(db: Session) -> list[dict]:
-    audio_items = db.query(Audio).all()
-    return [{"url": item.url} for item in audio_items]
+    # Plain column projection: no ORM objects or identity-map bookkeeping
+    rows = db.execute(select(Audio.url)).all()
+    return [{"url": url} for (url,) in rows]
 
 def update_shape(db: Session, shape_id: int, data: dict) -> dict | None:
-    shape = db.query(Shape).filter(Shape.id == shape_id).first()
+    shape = db.get(Shape, shape_id)
     if not shape:
         return None
     
@@ -71,7 +102,7 @@ def update_shape(db: Session, shape_id: int, data: dict) -> dict | None:
     
     # Update properties (text-specific fields and other custom properties)
     # Extract properties that aren't the main columns
-    properties = {k: v for k, v in data.items() if k not in ["id", "x", "y", "width", "height", "rotate"]}
+    properties = {k: v for k, v in data.items() if k not in _SHAPE_COLUMNS}
     
     if properties:
         # Merge with existing properties to preserve other fields
@@ -84,23 +115,12 @@ def update_shape(db: Session, shape_id: int, data: dict) -> dict | None:
         from sqlalchemy.orm.attributes import flag_modified
         flag_modified(shape, "properties")
     
+    # Serialize before commit: commit expires the instance, and reading it
+    # back afterwards would cost another SELECT for values we already have.
+    result = _shape_to_dict(shape)
     db.commit()
-    db.refresh(shape)
-    
+
     # Return full shape data including properties
-    result = {
-        "id": shape.id,
-        "x": shape.x,
-        "y": shape.y,
-        "width": shape.width,
-        "height": shape.height,
-        "rotate": shape.rotate
-    }
-    
-    # Include properties in response
-    if shape.properties:
-        result.update(shape.properties)
-    
     return result
 
 def create_shape(db: Session, page_id: str, data: dict) -> dict | None:
@@ -116,7 +136,7 @@ def create_shape(db: Session, page_id: str, data: dict) -> dict | None:
     # We exclude the columns we already extracted to avoid duplication, 
     # but for simplicity in this demo we can just dump everything else or specific known props.
     # Let's filter out the main columns from properties.
-    properties = {k: v for k, v in data.items() if k not in ["id", "kind", "x", "y", "width", "height", "rotate"]}
+    properties = {k: v for k, v in data.items() if k not in _SHAPE_COLUMNS}
     
     new_shape = Shape(
         page_id=page_id,
@@ -130,22 +150,13 @@ def create_shape(db: Session, page_id: str, data: dict) -> dict | None:
     )
     
     db.add(new_shape)
-    db.commit()
-    db.refresh(new_shape)
-    
+    # flush() fills in the autoincrement id (lastrowid / RETURNING); build the
+    # response before commit expires the instance, so no refresh SELECT is needed.
+    db.flush()
+
     # Return the full shape data as the frontend expects it (merged)
-    shape_dict = {
-        "id": new_shape.id,
-        "kind": new_shape.kind,
-        "x": new_shape.x,
-        "y": new_shape.y,
-        "width": new_shape.width,
-        "height": new_shape.height,
-        "rotate": new_shape.rotate,
-    }
-    if new_shape.properties:
-        shape_dict.update(new_shape.properties)
-        
+    shape_dict = _shape_to_dict(new_shape)
+    db.commit()
     return shape_dict
 
 def sync_page_shapes(db: Session, page_id: str, shapes_data: list[dict]) -> list[dict]:
@@ -154,104 +165,88 @@ def sync_page_shapes(db: Session, page_id: str, shapes_data: list[dict]) -> list
     - Deletes shapes not in the list.
     - Updates existing shapes.
     - Creates new shapes.
+
+    All writes go through the bulk APIs and a single DELETE ... IN,
+    so the round-trip count no longer grows with the number of shapes.
     """
-    # 1. Fetch all existing shapes for the page
-    existing_shapes = db.query(Shape).filter(Shape.page_id == page_id).all()
-    existing_shape_map = {s.id: s for s in existing_shapes}
-    
+    # 1. Fetch the ids of all existing shapes for the page
+    existing_ids = set(db.scalars(select(Shape.id).where(Shape.page_id == page_id)))
+
     incoming_ids = set()
-    result_shapes = []
-    
-    # 2. Process incoming shapes (Upsert)
+    to_update = []
+    to_insert = []
+    result_rows = []
+
+    # 2. Partition incoming shapes into updates and inserts (Upsert)
     for shape_data in shapes_data:
         shape_id = shape_data.get("id")
-        
-        # Extract columns
-        kind = shape_data.get("kind", "text")
-        x = shape_data.get("x", 0)
-        y = shape_data.get("y", 0)
-        width = shape_data.get("width", 100)
-        height = shape_data.get("height", 100)
-        rotate = shape_data.get("rotate", 0)
-        
-        # Extract properties
-        properties = {k: v for k, v in shape_data.items() if k not in ["id", "kind", "x", "y", "width", "height", "rotate"]}
-        
-        if shape_id and shape_id in existing_shape_map:
-            # Update existing
-            shape = existing_shape_map[shape_id]
-            shape.x = x
-            shape.y = y
-            shape.width = width
-            shape.height = height
-            shape.rotate = rotate
-            shape.properties = properties
-            # Kind usually doesn't change, but let's update it if it does
-            shape.kind = kind
-            
+
+        row = {
+            "page_id": page_id,
+            "kind": shape_data.get("kind", "text"),
+            "x": shape_data.get("x", 0),
+            "y": shape_data.get("y", 0),
+            "width": shape_data.get("width", 100),
+            "height": shape_data.get("height", 100),
+            "rotate": shape_data.get("rotate", 0),
+            # Everything that isn't a column goes into properties
+            "properties": {k: v for k, v in shape_data.items() if k not in _SHAPE_COLUMNS},
+        }
+
+        if shape_id and shape_id in existing_ids:
+            row["id"] = shape_id
             incoming_ids.add(shape_id)
-            result_shapes.append(shape)
+            to_update.append(row)
         else:
-            # Create new
-            # If ID is provided (e.g. from frontend generation), we can try to use it if DB allows.
-            # But usually DB autoincrements. 
-            # However, for Undo/Redo to work across clients, we might want to respect the ID if possible,
-            # OR we accept that IDs might shift and frontend needs to reload.
-            # But wait, if we just created a shape in frontend with a temp ID, and now we sync,
-            # we want to persist that.
-            # For this demo, let's assume we can just create a new one. 
-            # If the frontend sends an ID that isn't in DB, it's effectively a "new" shape from DB perspective
-            # (maybe it was deleted in DB but frontend undid the delete).
-            # We should probably let DB assign ID to be safe, OR force ID if we enabled that.
-            # Our Shape model has `id = Column(Integer, primary_key=True, index=True, autoincrement=True)`.
-            # We can't easily force ID unless we change schema or use a different strategy.
-            # So we'll create a new shape.
-            
-            new_shape = Shape(
-                page_id=page_id,
-                kind=kind,
-                x=x,
-                y=y,
-                width=width,
-                height=height,
-                rotate=rotate,
-                properties=properties
-            )
-            db.add(new_shape)
-            # We need to flush to get the ID if we want to return it, 
-            # but we can't easily map it back to the incoming ID if we don't return a map.
-            # For now, let's just add it.
-            result_shapes.append(new_shape)
-            
-    # 3. Delete shapes not in incoming list
-    for shape in existing_shapes:
-        if shape.id not in incoming_ids:
-            # If an incoming shape had an ID that wasn't in DB (e.g. undid a delete), 
-            # we created a NEW shape above.
-            # The old shape with that ID is already gone (hence not in DB).
-            # So we only delete shapes that ARE in DB but NOT in incoming list.
-            db.delete(shape)
-            
-    db.commit()
-    
-    # Refresh all to get IDs
-    for s in result_shapes:
-        db.refresh(s)
-        
-    # Return formatted data
-    formatted_shapes = []
-    for s in result_shapes:
-        s_dict = {
-            "id": s.id,
-            "kind": s.kind,
-            "x": s.x,
-            "y": s.y,
-            "width": s.width,
-            "height": s.height,
-            "rotate": s.rotate,
+            # An id the DB doesn't know (temp id from the frontend, or a shape
+            # that was deleted and brought back by undo) becomes a new shape.
+            # Shape.id autoincrements, so the DB assigns the real id.
+            to_insert.append(row)
+        result_rows.append(row)
+
+    # 3. Shapes that are in the DB but not in the incoming list get deleted
+    delete_ids = existing_ids - incoming_ids
+
+    # 4. Apply everything in one transaction. Nothing here needs pending ORM
+    # state flushed first, so autoflush is held off for the whole batch even
+    # if the session was configured with it.
+    with db.no_autoflush:
+        try:
+            if to_update:
+                db.bulk_update_mappings(Shape, to_update)
+            if to_insert:
+                # INSERT ... RETURNING hands back the generated ids with the
+                # insert itself, in the same order as the rows we passed in.
+                new_ids = db.scalars(
+                    insert(Shape).returning(Shape.id, sort_by_parameter_order=True),
+                    to_insert,
+                )
+                for row, new_id in zip(to_insert, new_ids):
+                    row["id"] = new_id
+            if delete_ids:
+                # Deleted last so SQLite can't hand a just-freed id to a new shape
+                db.execute(
+                    delete(Shape).where(Shape.id.in_(delete_ids)),
+                    execution_options={"synchronize_session": False},
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+    # Return formatted data, flattened the same way as _shape_to_dict
+    formatted_shapes = [
+        {
+            **row["properties"],
+            "id": row["id"],
+            "kind": row["kind"],
+            "x": row["x"],
+            "y": row["y"],
+            "width": row["width"],
+            "height": row["height"],
+            "rotate": row["rotate"],
         }
-        if s.properties:
-            s_dict.update(s.properties)
-        formatted_shapes.append(s_dict)
-        
+        for row in result_rows
+    ]
+
     return formatted_shapes
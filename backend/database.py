@@ -1,13 +1,31 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import StaticPool
 
 import os
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./canvaskit.db")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+_url = make_url(SQLALCHEMY_DATABASE_URL)
+
+# Every WebSocket client checks out connections for its shape updates, so the
+# default pool (5 + 10 overflow) is too small. Connections are reset with a
+# plain rollback and not pinged on checkout to keep checkout cheap.
+_engine_kwargs = {
+    "pool_pre_ping": False,
+    "pool_reset_on_return": "rollback",
+}
+if _url.get_backend_name() == "sqlite":
+    _engine_kwargs["connect_args"] = {"check_same_thread": False}
+
+if _url.get_backend_name() == "sqlite" and _url.database in (None, "", ":memory:"):
+    # An in-memory database only exists on its one connection
+    _engine_kwargs["poolclass"] = StaticPool
+else:
+    _engine_kwargs.update(pool_size=50, max_overflow=100, pool_recycle=1800)
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **_engine_kwargs)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -6,17 +6,36 @@ import os
 # Add the project root to sys.path to allow imports from 'backend'
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import json
+import asyncio
+import functools
+import itertools
 import struct
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
-from typing import Any, List
+from typing import Any, Awaitable, Callable, List, Union
 
+import msgspec
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
 
 from backend.database import SessionLocal
 from backend.seed import seed_data
 from backend.models import Document
+from backend.schemas import (
+    Event,
+    InboundEvent,
+    LoadAudio,
+    LoadDocument,
+    Ping,
+    ShapeCreate,
+    ShapeUpdate,
+    SyncPageShapes,
+)
 from backend.websocket_manager import ConnectionManager
 from backend.crud import get_document_data, get_audio_data, update_shape, create_shape, sync_page_shapes
 
@@ -30,7 +49,7 @@ async def lifespan(app: FastAPI):
     # Verify loaded data
     db = SessionLocal()
     try:
-        docs = db.query(Document).all()
+        docs = db.scalars(select(Document)).all()
         print(f"Available Documents after seed: {[doc.id for doc in docs]}")
     finally:
         db.close()
@@ -59,33 +78,230 @@ app.add_middleware(
 
 manager = ConnectionManager()
 
+# Anything send_bytes can hand to the ASGI server without converting it first
+BytesLike = Union[bytes, bytearray, memoryview]
+
+# Runs a blocking call on a connection's DB thread and returns its awaitable result
+DbRunner = Callable[..., Awaitable[Any]]
+
+# Big-endian uint32 packer for lengths and counts; the format is compiled once
+# and the bound method saves an attribute lookup on every frame.
+_PACK_U32 = struct.Struct(">I").pack
+
+# One-byte tag at the start of every header message naming the payload format
+FORMAT_JSON = 0x00
+FORMAT_MSGPACK = 0x01
+FORMAT_MSGPACK_DEFLATE = 0x02
+_FORMAT_MSGPACK_TAG = bytes((FORMAT_MSGPACK,))
+_FORMAT_MSGPACK_DEFLATE_TAG = bytes((FORMAT_MSGPACK_DEFLATE,))
+
+# With compress=True, payloads at least this big are zlib-compressed when that
+# makes them smaller. Only cached frames built on a connection's DB thread ask
+# for it: compressing is paid once per cache fill and never on the event loop.
+_COMPRESS_MIN_BYTES = 1024
+
+# Reusable msgspec codecs. Outbound payloads are MessagePack; inbound messages
+# may be either, JSON being what the browser client sends.
+_MSGPACK_ENCODER = msgspec.msgpack.Encoder()
+_MSGPACK_DECODER = msgspec.msgpack.Decoder()
+_JSON_DECODER = msgspec.json.Decoder()
+# Typed decoders for the events the server handles: the "event" key selects the
+# Struct, so handlers get validated attributes without a dict ever being built.
+_MSGPACK_EVENT_DECODER = msgspec.msgpack.Decoder(InboundEvent)
+_JSON_EVENT_DECODER = msgspec.json.Decoder(InboundEvent)
+
+# First bytes of a MessagePack map (fixmap, map16, map32). Valid JSON can't
+# start with any of them, so they tell the two inbound formats apart.
+_MSGPACK_MAP_MARKERS = frozenset((*range(0x80, 0x90), 0xDE, 0xDF))
+
+# Heartbeats exactly as clients serialize them, matched before any decoding.
+# Other spellings (whitespace, MessagePack) still get caught after decoding.
+_RAW_PINGS = frozenset((b'"ping"', b'{"event":"ping"}'))
+
+# Fully built "document_loaded_binary" frames keyed by document id.
+# Shape events only carry shape/page ids, so caching a frame also records
+# which document each of its pages and shapes belongs to, and evicting it
+# forgets them again: the reverse maps only ever cover cached documents.
+# A write to an id that isn't recorded can't touch a cached document, since
+# anything created after a document was cached invalidates it.
+_DOC_CACHE: dict[str, bytes] = {}
+_DOC_IDS: dict[str, tuple[list[str], list[int]]] = {}
+_PAGE_DOCS: dict[str, str] = {}
+_SHAPE_DOCS: dict[int, str] = {}
+# Bumped by every invalidation. Frames are built off the event loop, so a
+# frame whose build overlapped a write is sent but not cached.
+_doc_cache_generation = 0
+# Builds in flight, keyed by document id. Concurrent loads of an uncached
+# document await the same build instead of each querying and encoding it.
+_DOC_BUILDS: dict[str, asyncio.Task[bytes | None]] = {}
+
+# (expiry timestamp, "audio_loaded" frame). Audio is seed data and nothing here
+# mutates it, so a short TTL is all the invalidation it needs.
+_AUDIO_CACHE_TTL_SECONDS = 60.0
+_AUDIO_CACHE: tuple[float, bytes] | None = None
+
 
 @app.get("/health")
 async def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
-async def send_binary_response(websocket: WebSocket, json_data: Any, blobs: List[bytes]) -> None:
+def build_binary_frame(json_data: Any, blob_count: int = 0, compress: bool = False) -> bytes:
     """
-    Sends a binary frame:
-    [4 bytes: JSON Length]
-    [JSON Payload]
-    [4 bytes: Blob 1 Length] [Blob 1]
-    ...
+    Builds the header message of a binary response:
+    [1 byte: Format Tag (FORMAT_MSGPACK, or FORMAT_MSGPACK_DEFLATE if compressed)]
+    [4 bytes: Payload Length]
+    [MessagePack Payload, zlib-compressed for FORMAT_MSGPACK_DEFLATE]
+    [4 bytes: Blob Count]
     """
-    json_bytes = json.dumps(json_data).encode("utf-8")
-    json_len = len(json_bytes)
-    
-    payload = bytearray()
-    payload.extend(struct.pack(">I", json_len))
-    payload.extend(json_bytes)
-    
-    for blob in blobs:
-        blob_len = len(blob)
-        payload.extend(struct.pack(">I", blob_len))
-        payload.extend(blob)
-        
-    await manager.send_bytes(bytes(payload), websocket)
+    packed = _MSGPACK_ENCODER.encode(json_data)
+    tag = _FORMAT_MSGPACK_TAG
+    if compress and len(packed) >= _COMPRESS_MIN_BYTES:
+        compressed = zlib.compress(packed)
+        if len(compressed) < len(packed):
+            packed = compressed
+            tag = _FORMAT_MSGPACK_DEFLATE_TAG
+
+    # join() sizes the result once and copies each fragment into it exactly
+    # once, with no intermediate bytearray to convert back to bytes.
+    return b"".join((
+        tag,
+        _PACK_U32(len(packed)),
+        packed,
+        _PACK_U32(blob_count),
+    ))
+
+
+# Replies that never change, built once at import
+_PONG_FRAME = build_binary_frame({"event": "pong"})
+_ERR_INVALID_JSON_FRAME = build_binary_frame({
+    "event": "error",
+    "message": "Invalid JSON bytes"
+})
+
+
+def decode_event(data: bytes) -> InboundEvent:
+    """Decodes an inbound message into its event Struct; raises msgspec.ValidationError for anything else."""
+    if data and data[0] in _MSGPACK_MAP_MARKERS:
+        return _MSGPACK_EVENT_DECODER.decode(data)
+    return _JSON_EVENT_DECODER.decode(data)
+
+
+def decode_message(data: bytes) -> Any:
+    """Decodes an inbound message, MessagePack if it starts with a map marker, JSON otherwise."""
+    if data and data[0] in _MSGPACK_MAP_MARKERS:
+        return _MSGPACK_DECODER.decode(data)
+    return _JSON_DECODER.decode(data)
+
+
+async def send_binary_response(websocket: WebSocket, json_data: Any, blobs: List[BytesLike]) -> None:
+    """
+    Sends JSON data plus blobs as one header message followed by one message
+    per blob. WebSocket framing already delimits the messages, so no blob has
+    to be concatenated with the others and peak memory is the largest blob,
+    not their sum.
+    """
+    # Blob messages are the blobs themselves: no length prefix to prepend means
+    # no copy, and bytearray/memoryview blobs go to the ASGI send as they are.
+    frames = itertools.chain((build_binary_frame(json_data, len(blobs)),), blobs)
+    await manager.send_bytes_sequence(frames, websocket)
+
+
+def get_audio_frame(db: Session) -> bytes:
+    """Returns the "audio_loaded" frame, rebuilding it once the cached one expires."""
+    global _AUDIO_CACHE
+
+    now = time.monotonic()
+    if _AUDIO_CACHE is not None and _AUDIO_CACHE[0] > now:
+        return _AUDIO_CACHE[1]
+
+    frame = build_binary_frame({
+        "event": "audio_loaded",
+        "data": get_audio_data(db)
+    }, compress=True)
+    _AUDIO_CACHE = (now + _AUDIO_CACHE_TTL_SECONDS, frame)
+    return frame
+
+
+def build_document_frame(db: Session, doc_id: str) -> tuple[bytes, dict] | None:
+    """Queries and encodes a "document_loaded_binary" frame, returned with the document structure."""
+    doc_structure, _ = get_document_data(db, doc_id)
+    if not doc_structure:
+        return None
+
+    frame = build_binary_frame({
+        "event": "document_loaded_binary",
+        "data": doc_structure
+    }, compress=True)
+    return frame, doc_structure
+
+
+async def get_document_frame(run_db: DbRunner, db: Session, doc_id: str) -> bytes | None:
+    """Returns the "document_loaded_binary" frame, or None if the document doesn't exist."""
+    frame = _DOC_CACHE.get(doc_id)
+    if frame is not None:
+        return frame
+
+    build = _DOC_BUILDS.get(doc_id)
+    if build is None:
+        build = asyncio.ensure_future(_build_and_cache_document(run_db, db, doc_id))
+        _DOC_BUILDS[doc_id] = build
+        build.add_done_callback(
+            lambda done: _DOC_BUILDS.pop(doc_id) if _DOC_BUILDS.get(doc_id) is done else None
+        )
+    # Shielded: a caller that goes away must not cancel the build for the others
+    return await asyncio.shield(build)
+
+
+async def _build_and_cache_document(run_db: DbRunner, db: Session, doc_id: str) -> bytes | None:
+    """Builds a document frame and caches it unless a write happened meanwhile."""
+    generation = _doc_cache_generation
+    built = await run_db(build_document_frame, db, doc_id)
+    if built is None:
+        return None
+
+    frame, doc_structure = built
+    # Cache bookkeeping stays on the event loop, where invalidations run too
+    if generation == _doc_cache_generation:
+        _forget_document(doc_id)
+        page_ids = [page["id"] for page in doc_structure["pages"]]
+        shape_ids = [
+            shape_id for page in doc_structure["pages"] for shape_id in page["shapes"]["id"]
+        ]
+        _PAGE_DOCS.update(dict.fromkeys(page_ids, doc_id))
+        _SHAPE_DOCS.update(dict.fromkeys(shape_ids, doc_id))
+        _DOC_IDS[doc_id] = (page_ids, shape_ids)
+        _DOC_CACHE[doc_id] = frame
+    return frame
+
+
+def _forget_document(doc_id: str) -> None:
+    """Evicts a document's frame and removes its ids from the reverse maps."""
+    _DOC_CACHE.pop(doc_id, None)
+    ids = _DOC_IDS.pop(doc_id, None)
+    if ids is None:
+        return
+    page_ids, shape_ids = ids
+    for page_id in page_ids:
+        # Only drop entries that still point here
+        if _PAGE_DOCS.get(page_id) == doc_id:
+            del _PAGE_DOCS[page_id]
+    for shape_id in shape_ids:
+        if _SHAPE_DOCS.get(shape_id) == doc_id:
+            del _SHAPE_DOCS[shape_id]
+
+
+def invalidate_document(page_id: str | None = None, shape_id: int | None = None) -> None:
+    """Drops the cached frame of the document owning the given page or shape."""
+    global _doc_cache_generation
+
+    _doc_cache_generation += 1
+    # In-flight builds may have read the state before this write; later loads
+    # start their own instead of joining one of those.
+    _DOC_BUILDS.clear()
+    doc_id = _PAGE_DOCS.get(page_id) if page_id is not None else _SHAPE_DOCS.get(shape_id)
+    if doc_id is not None:
+        _forget_document(doc_id)
 
 
 async def send_binary_json(websocket: WebSocket, json_data: Any) -> None:
@@ -94,14 +310,124 @@ async def send_binary_json(websocket: WebSocket, json_data: Any) -> None:
 
 
 async def broadcast_binary_json(json_data: Any, exclude: WebSocket = None) -> None:
-    """Broadcasts a binary JSON message to all connected clients, optionally excluding one."""
-    for connection in manager.active_connections:
-        if connection != exclude:
-            try:
-                await send_binary_json(connection, json_data)
-            except Exception:
-                # Connection might be closed or erroring
-                pass
+    """Broadcasts a binary JSON message to all connected clients, optionally excluding one.
+
+    The frame is built once and the same bytes are queued for every client;
+    each connection's writer sends it, so no client waits on a slower one.
+    Clients too far behind to take the frame are dropped.
+    """
+    await manager.broadcast_bytes(build_binary_frame(json_data), exclude=exclude)
+
+
+# ==================== Event Handlers ====================
+# Each takes (websocket, db, run_db, event); the endpoint commits afterwards.
+
+async def handle_ping(websocket: WebSocket, db: Session, run_db: DbRunner, event: Ping) -> None:
+    await manager.send_bytes(_PONG_FRAME, websocket)
+
+
+async def handle_load_document(
+    websocket: WebSocket, db: Session, run_db: DbRunner, event: LoadDocument
+) -> None:
+    if not event.document_id:
+        return
+    frame = await get_document_frame(run_db, db, event.document_id)
+    if frame is not None:
+        await manager.send_bytes(frame, websocket)
+    else:
+        await send_binary_json(websocket, {
+            "event": "error",
+            "message": "Document not found"
+        })
+
+
+async def handle_load_audio(
+    websocket: WebSocket, db: Session, run_db: DbRunner, event: LoadAudio
+) -> None:
+    await manager.send_bytes(await run_db(get_audio_frame, db), websocket)
+
+
+async def handle_shape_update(
+    websocket: WebSocket, db: Session, run_db: DbRunner, event: ShapeUpdate
+) -> None:
+    data = event.data
+    shape_id = data.get("id")
+    if shape_id:
+        updated_shape = await run_db(update_shape, db, shape_id, data)
+        if updated_shape:
+            invalidate_document(shape_id=shape_id)
+            # Broadcast to all OTHER clients
+            await broadcast_binary_json({
+                "event": "shape_updated",
+                "data": updated_shape
+            }, exclude=websocket)
+
+
+async def handle_shape_create(
+    websocket: WebSocket, db: Session, run_db: DbRunner, event: ShapeCreate
+) -> None:
+    data = event.data
+    page_id = event.page_id
+    if not (data and page_id):
+        return
+
+    # Remove temporary ID if present, let DB assign one
+    data.pop("id", None)
+
+    new_shape = await run_db(create_shape, db, page_id, data)
+    if new_shape:
+        invalidate_document(page_id=page_id)
+        # Other clients just add the shape
+        await broadcast_binary_json({
+            "event": "shape_created",
+            "data": new_shape
+        }, exclude=websocket)
+
+        # Send back to sender so they can swap their temp ID for the real one
+        await send_binary_json(websocket, {
+            "event": "shape_created_ack",
+            "temp_id": event.temp_id,
+            "data": new_shape
+        })
+
+
+async def handle_sync_page_shapes(
+    websocket: WebSocket, db: Session, run_db: DbRunner, event: SyncPageShapes
+) -> None:
+    page_id = event.page_id
+    if page_id and event.shapes is not None:
+        synced_shapes = await run_db(sync_page_shapes, db, page_id, event.shapes)
+        invalidate_document(page_id=page_id)
+
+        # Broadcast full sync to all clients (including sender to confirm IDs/state)
+        await broadcast_binary_json({
+            "event": "page_state_synced",
+            "page_id": page_id,
+            "shapes": synced_shapes
+        })
+
+
+HANDLERS: dict[type[Event], Callable[..., Awaitable[None]]] = {
+    Ping: handle_ping,
+    LoadDocument: handle_load_document,
+    LoadAudio: handle_load_audio,
+    ShapeUpdate: handle_shape_update,
+    ShapeCreate: handle_shape_create,
+    SyncPageShapes: handle_sync_page_shapes,
+}
+
+# "event" tag -> Struct, for every event with a handler
+_EVENT_TYPES: dict[str, type[Event]] = {
+    event_type.__struct_config__.tag: event_type for event_type in HANDLERS
+}
+
+
+def is_handled_event(message: Any) -> bool:
+    """Whether an untyped decoded message carries the "event" tag of a handled event."""
+    if not isinstance(message, dict):
+        return False
+    tag = message.get("event")
+    return isinstance(tag, str) and tag in _EVENT_TYPES
 
 
 @app.websocket("/ws")
@@ -111,153 +437,94 @@ async def websocket_endpoint(websocket: WebSocket) -> None:
     ALL communications are now binary frames.
     
     Incoming Format:
-    - Just UTF-8 JSON bytes.
+    - UTF-8 JSON bytes, or a MessagePack map.
     
     Outgoing Format (Binary Protocol):
-    [4 bytes BigEndian: JSON Length]
-    [JSON Payload (UTF-8)]
-    [Optional: 4 bytes Blob 1 Length + Blob 1 Data...]
+    Header message:
+    [1 byte: Format Tag (0x00 JSON, 0x01 MessagePack, 0x02 zlib-compressed MessagePack)]
+    [4 bytes BigEndian: Payload Length]
+    [Payload]
+    [4 bytes BigEndian: Blob Count N]
+    Followed by N blob messages, each carrying one blob's raw bytes.
+
+    Header messages without blobs may be coalesced: one WebSocket message can
+    carry several of them back to back.
     """
     await manager.connect(websocket)
+    # One session for the lifetime of the socket instead of one per message.
+    # Its queries run on a single thread owned by this connection: the event
+    # loop keeps serving other sockets during a write, and the session (which
+    # isn't thread-safe) is never used from two threads at once.
+    db = SessionLocal()
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ws-db")
+    run_db: DbRunner = functools.partial(asyncio.get_running_loop().run_in_executor, executor)
 
     try:
         while True:
             # Receive bytes instead of text
             data_bytes = await websocket.receive_bytes()
 
-            # Parse incoming bytes as UTF-8 JSON
-            try:
-                data_text = data_bytes.decode("utf-8")
-                message = json.loads(data_text)
-            except (UnicodeDecodeError, json.JSONDecodeError):
-                await send_binary_json(websocket, {
-                    "event": "error",
-                    "message": "Invalid JSON bytes"
-                })
+            if data_bytes in _RAW_PINGS:
+                await manager.send_bytes(_PONG_FRAME, websocket)
                 continue
 
-            # Handle "ping" (string) or {"event": "ping"}
-            if message == "ping" or (isinstance(message, dict) and message.get("event") == "ping"):
-                 await send_binary_json(websocket, {"event": "pong"})
-                 continue
-
-            event_type = message.get("event") if isinstance(message, dict) else None
-
-            if event_type == "load_document":
-                doc_id = message.get("document_id")
-                if doc_id:
-                    db = SessionLocal()
-                    try:
-                        doc_structure, _ = get_document_data(db, doc_id)
-                        
-                        if doc_structure:
-                            response_event = {
-                                "event": "document_loaded_binary",
-                                "data": doc_structure
-                            }
-                            await send_binary_json(websocket, response_event)
-                        else:
-                            await send_binary_json(websocket, {
-                                "event": "error",
-                                "message": "Document not found"
-                            })
-                    finally:
-                        db.close()
-            
-            elif event_type == "load_audio":
-                db = SessionLocal()
+            # Parse incoming bytes straight into the event's Struct (msgspec
+            # decodes bytes directly, and valid events never become a dict)
+            try:
+                event = decode_event(data_bytes)
+            except msgspec.ValidationError as exc:
+                # Not a valid handled event: decode untyped to tell a malformed
+                # request apart from a message meant to be echoed
                 try:
-                    audio_data = get_audio_data(db)
+                    message = decode_message(data_bytes)
+                except msgspec.DecodeError:
+                    await manager.send_bytes(_ERR_INVALID_JSON_FRAME, websocket)
+                    continue
+
+                if is_handled_event(message):
+                    await send_binary_json(websocket, {
+                        "event": "error",
+                        "message": str(exc)
+                    })
+                elif message == "ping":
+                    await manager.send_bytes(_PONG_FRAME, websocket)
+                else:
+                    # Unknown event or plain message structure
+                    # Echo back as binary
                     await send_binary_json(websocket, {
-                        "event": "audio_loaded",
-                        "data": audio_data
+                        "event": "echo",
+                        "data": message
                     })
-                finally:
-                    db.close()
-            
-            elif event_type == "shape_update":
-                data = message.get("data")
-                shape_id = data.get("id")
-                if shape_id:
-                    db = SessionLocal()
-                    try:
-                        updated_shape = update_shape(db, shape_id, data)
-                        if updated_shape:
-                            # Broadcast to all OTHER clients
-                            await broadcast_binary_json({
-                                "event": "shape_updated",
-                                "data": updated_shape
-                            }, exclude=websocket)
-                    finally:
-                        db.close()
-            
-            elif event_type == "shape_create":
-                data = message.get("data")
-                page_id = message.get("page_id")
-                if data and page_id:
-                    db = SessionLocal()
-                    try:
-                        # Remove temporary ID if present, let DB assign one
-                        if "id" in data:
-                            del data["id"]
-                            
-                        new_shape = create_shape(db, page_id, data)
-                        if new_shape:
-                            # Broadcast to all clients (including sender, to confirm ID?)
-                            # Actually, sender already has it optimistically. 
-                            # But sender needs the REAL ID.
-                            # For now, let's broadcast to others. Sender might need a specific ack to update ID.
-                            # In this simple demo, we might just broadcast 'shape_created' to others.
-                            # The sender might reload or we can send a specific 'shape_created' back to sender with temp_id mapping?
-                            # For simplicity: Broadcast to others. Sender keeps using temp ID until reload? 
-                            # Or better: Broadcast to ALL, sender updates its shape with real ID if it matches temp ID?
-                            # But we deleted temp ID from data passed to create_shape.
-                            
-                            # Let's just broadcast to others for now.
-                            await broadcast_binary_json({
-                                "event": "shape_created",
-                                "data": new_shape
-                            }, exclude=websocket)
-                            
-                            # Send back to sender so they can update the ID
-                            await send_binary_json(websocket, {
-                                "event": "shape_created_ack",
-                                "temp_id": message.get("temp_id"), # Frontend should send this
-                                "data": new_shape
-                            })
-                    finally:
-                        db.close()
-
-            elif event_type == "sync_page_shapes":
-                page_id = message.get("page_id")
-                shapes_data = message.get("shapes")
-                
-                if page_id and shapes_data is not None:
-                    db = SessionLocal()
-                    try:
-                        synced_shapes = sync_page_shapes(db, page_id, shapes_data)
-                        
-                        # Broadcast full sync to all clients (including sender to confirm IDs/state)
-                        await broadcast_binary_json({
-                            "event": "page_state_synced",
-                            "page_id": page_id,
-                            "shapes": synced_shapes
-                        })
-                    finally:
-                        db.close()
-
-            else:
-                # Unknown event or plain message structure
-                # Echo back as binary
+                continue
+            except msgspec.DecodeError:
+                await manager.send_bytes(_ERR_INVALID_JSON_FRAME, websocket)
+                continue
+
+            try:
+                await HANDLERS[type(event)](websocket, db, run_db, event)
+
+                # End the transaction after every message: it hands the connection
+                # back to the pool and expires the identity map, so the next read
+                # sees what other clients have written in the meantime.
+                await run_db(db.commit)
+            except SQLAlchemyError:
+                # A failed statement poisons the transaction; roll it back so the
+                # connection's session stays usable for the next message.
+                await run_db(db.rollback)
                 await send_binary_json(websocket, {
-                    "event": "echo",
-                    "data": message
+                    "event": "error",
+                    "message": f"Failed to handle {event.__struct_config__.tag!r}"
                 })
 
     except WebSocketDisconnect:
         manager.disconnect(websocket)
     except Exception:
         manager.disconnect(websocket)
+    finally:
+        # Close on the DB thread, after anything still queued there, without
+        # blocking the event loop on it.
+        executor.submit(db.close)
+        executor.shutdown(wait=False)
 
 
 # If you want to run this directly: `python backend/main.py`
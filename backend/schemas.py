@@ -0,0 +1,38 @@
+from typing import Any, Dict, List, Optional, Union
+
+import msgspec
+
+
+class Event(msgspec.Struct, tag_field="event"):
+    """Base for inbound WebSocket events; the "event" key picks the subclass."""
+
+
+class Ping(Event, tag="ping"):
+    pass
+
+
+class LoadDocument(Event, tag="load_document"):
+    document_id: Optional[str] = None
+
+
+class LoadAudio(Event, tag="load_audio"):
+    pass
+
+
+class ShapeUpdate(Event, tag="shape_update"):
+    # Shape fields are free-form (columns plus arbitrary properties)
+    data: Dict[str, Any]
+
+
+class ShapeCreate(Event, tag="shape_create"):
+    data: Optional[Dict[str, Any]] = None
+    page_id: Optional[str] = None
+    temp_id: Any = None
+
+
+class SyncPageShapes(Event, tag="sync_page_shapes"):
+    page_id: Optional[str] = None
+    shapes: Optional[List[Dict[str, Any]]] = None
+
+
+InboundEvent = Union[Ping, LoadDocument, LoadAudio, ShapeUpdate, ShapeCreate, SyncPageShapes]
@@ -1,12 +1,36 @@
-import json
 import os
+
+import msgspec
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
 from backend.database import SessionLocal, engine, Base
 from backend.models import Document, Page, Shape, Audio
 
 def load_json_data(filepath: str):
-    with open(filepath, 'r') as f:
-        return json.load(f)
+    """
+    Loads a mock JSON file through a MessagePack sidecar (`<file>.msgpack`).
+    The sidecar is rewritten whenever the JSON is newer, so restarts decode
+    MessagePack instead of parsing JSON.
+    """
+    sidecar_path = filepath + ".msgpack"
+    try:
+        if os.path.getmtime(sidecar_path) >= os.path.getmtime(filepath):
+            with open(sidecar_path, 'rb') as f:
+                return msgspec.msgpack.decode(f.read())
+    except (OSError, msgspec.DecodeError):
+        # Missing, unreadable or corrupt sidecar: fall back to the JSON
+        pass
+
+    with open(filepath, 'rb') as f:
+        data = msgspec.json.decode(f.read())
+
+    try:
+        with open(sidecar_path, 'wb') as f:
+            f.write(msgspec.msgpack.encode(data))
+    except OSError:
+        # Read-only checkout; the JSON is still the source of truth
+        pass
+    return data
 
 def seed_data():
     # Create tables
@@ -22,6 +46,12 @@ def seed_data():
             "sample1.json"
         ]
 
+        # Rows are collected for every document and written with one
+        # executemany INSERT per table, instead of one ORM add per row.
+        document_rows = []
+        page_rows = []
+        shape_rows = []
+
         for mock_file in mock_files:
             mock_data_path = os.path.join("backend", "mocks", mock_file)
             if not os.path.exists(mock_data_path):
@@ -35,54 +65,54 @@ def seed_data():
             doc_id = doc_data["id"]
             
             # Check if document already exists
-            existing_doc = db.query(Document).filter(Document.id == doc_id).first()
+            existing_doc = db.execute(select(Document).where(Document.id == doc_id)).scalar_one_or_none()
             if existing_doc:
                 print(f"Document {doc_id} from {mock_file} already exists. Skipping.")
                 continue
 
             print(f"Seeding document {doc_id} from {mock_file}...")
-            document = Document(id=doc_id)
-            db.add(document)
-            
+            document_rows.append({"id": doc_id})
+
             for page_data in doc_data["pages"]:
-                page = Page(
-                    id=page_data["id"],
-                    document_id=document.id,
-                    width=page_data["width"],
-                    height=page_data["height"],
-                    background=page_data["background"]
-                )
-                db.add(page)
-                
+                page_rows.append({
+                    "id": page_data["id"],
+                    "document_id": doc_id,
+                    "width": page_data["width"],
+                    "height": page_data["height"],
+                    "background": page_data["background"]
+                })
+
                 for shape_data in page_data["shapes"]:
                     # Extract common fields
                     common_fields = ["kind", "x", "y", "width", "height", "rotate"]
                     properties = {k: v for k, v in shape_data.items() if k not in common_fields}
-                    
-                    shape = Shape(
-                        page_id=page.id,
-                        kind=shape_data["kind"],
-                        x=shape_data["x"],
-                        y=shape_data["y"],
-                        width=shape_data["width"],
-                        height=shape_data["height"],
-                        rotate=shape_data["rotate"],
-                        properties=properties
-                    )
-                    db.add(shape)
+
+                    shape_rows.append({
+                        "page_id": page_data["id"],
+                        "kind": shape_data["kind"],
+                        "x": shape_data["x"],
+                        "y": shape_data["y"],
+                        "width": shape_data["width"],
+                        "height": shape_data["height"],
+                        "rotate": shape_data["rotate"],
+                        "properties": properties
+                    })
             print(f"Successfully seeded document {doc_id}.")
 
+        # Parents first, so every foreign key points at a row that exists
+        for model, rows in ((Document, document_rows), (Page, page_rows), (Shape, shape_rows)):
+            if rows:
+                db.execute(insert(model), rows)
+
         # Load Audio Data
-        if not db.query(Audio).first():
+        if not db.scalars(select(Audio).limit(1)).first():
             audio_data_path = os.path.join("backend", "mocks", "audio.json")
             if not os.path.exists(audio_data_path):
                  audio_data_path = os.path.join("mocks", "audio.json")
             
             if os.path.exists(audio_data_path):
                 audio_list = load_json_data(audio_data_path)
-                for audio_item in audio_list:
-                    audio = Audio(url=audio_item["url"])
-                    db.add(audio)
+                db.execute(insert(Audio), [{"url": audio_item["url"]} for audio_item in audio_list])
                 print("Seeded audio data.")
             else:
                 print(f"Warning: Audio mock data not found at {audio_data_path}")
@@ -1,29 +1,74 @@
 from __future__ import annotations
-from typing import Set, Dict, Any
+from typing import Dict, Any, Awaitable, Iterable, List, Set, Union
 from uuid import uuid4
 import asyncio
 from fastapi import WebSocket
 
+# An outbound queue item: one self-delimiting header frame, which the writer may
+# coalesce with its neighbours, or a sequence of frames that must each go out
+# as their own WebSocket message (a header followed by its blobs).
+OutboundItem = Union[bytes, Iterable[bytes]]
+
+# Frames a client may have waiting before it is considered too slow to keep
+OUTBOUND_QUEUE_SIZE = 1024
+
+# Close code for pruned connections ("Try Again Later"): the client's
+# reconnect logic brings it back with a fresh document load.
+PRUNED_CLOSE_CODE = 1013
+
+
 class ConnectionManager:
     """Simple in‑memory WebSocket connection manager."""
 
     def __init__(self) -> None:
-        self.active_connections: Set[WebSocket] = set()
+        # Per-connection state lives in parallel lists, so broadcasts walk
+        # plain lists instead of hashing every WebSocket. `_index` maps
+        # id(websocket) to its slot for O(1) lookups and swap-removal.
+        self.active_connections: List[WebSocket] = []
         # Store client ids as opaque strings (e.g., UUIDs), not ints.
-        self._client_ids: Dict[WebSocket, str] = {}
+        self._client_ids: List[str] = []
+        # Binary sends are queued per connection and drained by one writer
+        # task each, which keeps them ordered and batches bursts.
+        self._out_queues: List[asyncio.Queue[OutboundItem]] = []
+        self._writers: List[asyncio.Task[None]] = []
+        self._index: Dict[int, int] = {}
+        # Closes of dropped connections, kept referenced until they finish
+        self._closing: Set[asyncio.Task[None]] = set()
 
     async def connect(self, websocket: WebSocket) -> None:
         await websocket.accept()
-        self.active_connections.add(websocket)
+        queue: asyncio.Queue[OutboundItem] = asyncio.Queue(maxsize=OUTBOUND_QUEUE_SIZE)
+        self._index[id(websocket)] = len(self.active_connections)
+        self.active_connections.append(websocket)
         # Assign a UUID-based client id (string, not int).
-        self._client_ids[websocket] = str(uuid4())
+        self._client_ids.append(str(uuid4()))
+        self._out_queues.append(queue)
+        self._writers.append(asyncio.create_task(self._writer(websocket, queue)))
 
     def disconnect(self, websocket: WebSocket) -> None:
-        self.active_connections.discard(websocket)
-        self._client_ids.pop(websocket, None)
+        index = self._index.pop(id(websocket), None)
+        if index is None:
+            return
+
+        writer = self._writers[index]
+        # Move the last connection into the freed slot, then drop the tail
+        last = len(self.active_connections) - 1
+        if index != last:
+            moved = self.active_connections[last]
+            self.active_connections[index] = moved
+            self._client_ids[index] = self._client_ids[last]
+            self._out_queues[index] = self._out_queues[last]
+            self._writers[index] = self._writers[last]
+            self._index[id(moved)] = index
+        self.active_connections.pop()
+        self._client_ids.pop()
+        self._out_queues.pop()
+        self._writers.pop()
+        writer.cancel()
 
     def get_client_id(self, websocket: WebSocket) -> str | None:
-        return self._client_ids.get(websocket)
+        index = self._index.get(id(websocket))
+        return None if index is None else self._client_ids[index]
 
     async def send_personal_message(self, message: str, websocket: WebSocket) -> None:
         await websocket.send_text(message)
@@ -32,24 +77,111 @@ class ConnectionManager:
         await websocket.send_json(data)
 
     async def send_bytes(self, data: bytes, websocket: WebSocket) -> None:
-        await websocket.send_bytes(data)
+        """Queue one header frame; the writer may batch it with other queued frames."""
+        self._enqueue(data, websocket)
+
+    async def send_bytes_sequence(self, frames: Iterable[bytes], websocket: WebSocket) -> None:
+        """Queue several binary messages to go out back to back, one message each."""
+        self._enqueue(frames, websocket)
+
+    def _enqueue(self, item: OutboundItem, websocket: WebSocket) -> None:
+        index = self._index.get(id(websocket))
+        if index is None:
+            raise RuntimeError("WebSocket is not connected")
+        try:
+            self._out_queues[index].put_nowait(item)
+        except asyncio.QueueFull:
+            # The client isn't keeping up; drop it rather than buffer forever.
+            self._drop(websocket)
+            raise
+
+    async def _writer(self, websocket: WebSocket, queue: asyncio.Queue[OutboundItem]) -> None:
+        """Drain a connection's queue, coalescing ready header frames into one message.
+
+        Header frames carry their own length prefixes, so the client can split
+        a batch back apart. Sequences are sent as-is, one message per frame.
+        """
+        try:
+            while True:
+                item = await queue.get()
+                batch: list[bytes] = []
+                while True:
+                    if isinstance(item, bytes):
+                        batch.append(item)
+                    else:
+                        if batch:
+                            await websocket.send_bytes(b"".join(batch))
+                            batch = []
+                        for frame in item:
+                            await websocket.send_bytes(frame)
+                    if queue.empty():
+                        break
+                    item = queue.get_nowait()
+                if batch:
+                    await websocket.send_bytes(batch[0] if len(batch) == 1 else b"".join(batch))
+        except Exception:
+            # Sending failed, so the connection is dead.
+            self._drop(websocket)
 
     async def broadcast(self, message: str) -> None:
         """Broadcast a message to all connected clients.
 
-        Dead connections are removed so future sends stay stable.
+        Sends run concurrently over a snapshot of the connections, and dead
+        connections are removed afterwards so future sends stay stable.
         """
-        to_remove: list[WebSocket] = []
+        connections = tuple(self.active_connections)
+        await self._fan_out(
+            connections, (connection.send_text(message) for connection in connections)
+        )
+
+    async def broadcast_bytes(self, data: bytes, exclude: WebSocket | None = None) -> None:
+        """Broadcast one prebuilt binary message to all clients except `exclude`.
 
-        for connection in self.active_connections:
+        The same bytes object goes to every client, so callers encode once.
+        Queueing never waits, so this is one tight pass over the connections;
+        clients whose queue is full are dropped once the pass is done.
+        """
+        too_slow: list[WebSocket] = []
+        for connection, queue in zip(self.active_connections, self._out_queues):
+            if connection is exclude:
+                continue
             try:
-                await connection.send_text(message)
-            except Exception:
-                # Connection is likely dead; mark it for removal.
-                to_remove.append(connection)
+                queue.put_nowait(data)
+            except asyncio.QueueFull:
+                too_slow.append(connection)
+
+        for connection in too_slow:
+            self._drop(connection)
+
+    async def _fan_out(self, connections: tuple[WebSocket, ...], sends: Iterable[Awaitable[None]]) -> None:
+        """Await one send per connection concurrently, then drop connections whose send failed."""
+        results = await asyncio.gather(*sends, return_exceptions=True)
 
-        for connection in to_remove:
-            self.disconnect(connection)
+        for connection, result in zip(connections, results):
+            if isinstance(result, Exception):
+                # Connection is likely dead; drop it.
+                self._drop(connection)
+
+    def _drop(self, websocket: WebSocket) -> None:
+        """Remove a connection from every broadcast now and close it in the background.
+
+        Closing ends its receive loop and lets a live-but-slow client reconnect
+        and resync, instead of sitting on a socket that no longer gets updates.
+        The close waits on the peer's handshake, so it must never be awaited by
+        whoever is sending to everyone else.
+        """
+        self.disconnect(websocket)
+        task = asyncio.create_task(self._close_quietly(websocket))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket) -> None:
+        try:
+            await websocket.close(code=PRUNED_CLOSE_CODE)
+        except Exception:
+            # Usually already closed or gone; nothing left to clean up.
+            pass
 
     async def send_periodic_test_message(
         self, websocket: WebSocket, interval_seconds: float = 3.0
@@ -136,7 +136,7 @@ export const ARCHITECTURE_DATA: ArchitectureData = {
 			description:
 				'The project uses a **Binary WebSocket Protocol** with real-time broadcast for multiplayer collaboration:',
 			steps: [
-				'**Message Format**: Binary frames with 4-byte header (JSON length) + UTF-8 JSON payload + optional binary blobs.',
+				'**Message Format**: Binary frames with 1-byte format tag + 4-byte header (payload length) + MessagePack payload (zlib-compressed for large document loads) + 4-byte blob count, followed by one message per binary blob.',
 				'**Update Events**: Shape modifications, page changes, and asset uploads are sent as structured events.',
 				'**Broadcast Mechanism**: Server receives updates from any client and broadcasts to all connected clients in the same session.',
 				'**Sync Flow**: (1) User edits → (2) Client sends update → (3) Server persists to DB → (4) Server broadcasts → (5) All clients receive and apply changes.',
@@ -37,6 +37,55 @@ export async function loadDocument(url: string): Promise<EditorDocument | null>
 	}
 }
 
+/**
+ * Page shapes as the server sends them on document load: one array per field,
+ * index i across all arrays being shape i.
+ */
+export interface ShapeColumns {
+	id: number[];
+	kind: Shape['kind'][];
+	x: number[];
+	y: number[];
+	width: number[];
+	height: number[];
+	rotate: (number | null)[];
+	properties: (Record<string, any> | null)[];
+}
+
+/**
+ * Rebuilds shape objects from their columnar form
+ * @param columns - One array per shape field
+ * @returns Shapes in column order; column values win over same-named properties
+ */
+export function shapesFromColumns(columns: ShapeColumns): Shape[] {
+	const { id, kind, x, y, width, height, rotate, properties } = columns;
+	const shapes = new Array<Shape>(id.length);
+	for (let i = 0; i < id.length; i++) {
+		shapes[i] = {
+			...properties[i],
+			id: id[i],
+			kind: kind[i],
+			x: x[i],
+			y: y[i],
+			width: width[i],
+			height: height[i],
+			rotate: rotate[i]
+		} as Shape;
+	}
+	return shapes;
+}
+
+/**
+ * Converts a "document_loaded_binary" payload, whose pages carry columnar
+ * shapes, into an editor document
+ */
+export function documentFromWire(data: any): EditorDocument {
+	return {
+		...data,
+		pages: data.pages.map((page: any) => ({ ...page, shapes: shapesFromColumns(page.shapes) }))
+	};
+}
+
 /**
  * Creates a default empty document
  */
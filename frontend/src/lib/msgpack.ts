@@ -0,0 +1,133 @@
+// Minimal MessagePack decoder for the server's binary protocol payloads.
+// Covers every type the backend encoder emits: nil, bool, int, float, str,
+// bin, array and map. Extension types are not used and are rejected.
+
+const textDecoder = new TextDecoder('utf-8');
+
+class Reader {
+	private view: DataView;
+	private bytes: Uint8Array;
+	private offset = 0;
+
+	constructor(bytes: Uint8Array) {
+		this.bytes = bytes;
+		this.view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+	}
+
+	get done() {
+		return this.offset >= this.bytes.byteLength;
+	}
+
+	private advance(size: number): number {
+		const start = this.offset;
+		if (start + size > this.bytes.byteLength) {
+			throw new RangeError('Unexpected end of MessagePack data');
+		}
+		this.offset += size;
+		return start;
+	}
+
+	private str(length: number): string {
+		const start = this.advance(length);
+		return textDecoder.decode(this.bytes.subarray(start, start + length));
+	}
+
+	private bin(length: number): Uint8Array {
+		const start = this.advance(length);
+		return this.bytes.slice(start, start + length);
+	}
+
+	private array(length: number): any[] {
+		const result = new Array(length);
+		for (let i = 0; i < length; i++) {
+			result[i] = this.read();
+		}
+		return result;
+	}
+
+	private map(length: number): Record<string, any> {
+		const result: Record<string, any> = {};
+		for (let i = 0; i < length; i++) {
+			const key = this.read();
+			result[key] = this.read();
+		}
+		return result;
+	}
+
+	read(): any {
+		const view = this.view;
+		const type = view.getUint8(this.advance(1));
+
+		// Fixed-size families
+		if (type <= 0x7f) return type; // positive fixint
+		if (type >= 0xe0) return type - 0x100; // negative fixint
+		if (type >= 0x80 && type <= 0x8f) return this.map(type & 0x0f);
+		if (type >= 0x90 && type <= 0x9f) return this.array(type & 0x0f);
+		if (type >= 0xa0 && type <= 0xbf) return this.str(type & 0x1f);
+
+		switch (type) {
+			case 0xc0:
+				return null;
+			case 0xc2:
+				return false;
+			case 0xc3:
+				return true;
+			case 0xc4:
+				return this.bin(view.getUint8(this.advance(1)));
+			case 0xc5:
+				return this.bin(view.getUint16(this.advance(2)));
+			case 0xc6:
+				return this.bin(view.getUint32(this.advance(4)));
+			case 0xca:
+				return view.getFloat32(this.advance(4));
+			case 0xcb:
+				return view.getFloat64(this.advance(8));
+			case 0xcc:
+				return view.getUint8(this.advance(1));
+			case 0xcd:
+				return view.getUint16(this.advance(2));
+			case 0xce:
+				return view.getUint32(this.advance(4));
+			case 0xcf:
+				return Number(view.getBigUint64(this.advance(8)));
+			case 0xd0:
+				return view.getInt8(this.advance(1));
+			case 0xd1:
+				return view.getInt16(this.advance(2));
+			case 0xd2:
+				return view.getInt32(this.advance(4));
+			case 0xd3:
+				return Number(view.getBigInt64(this.advance(8)));
+			case 0xd9:
+				return this.str(view.getUint8(this.advance(1)));
+			case 0xda:
+				return this.str(view.getUint16(this.advance(2)));
+			case 0xdb:
+				return this.str(view.getUint32(this.advance(4)));
+			case 0xdc:
+				return this.array(view.getUint16(this.advance(2)));
+			case 0xdd:
+				return this.array(view.getUint32(this.advance(4)));
+			case 0xde:
+				return this.map(view.getUint16(this.advance(2)));
+			case 0xdf:
+				return this.map(view.getUint32(this.advance(4)));
+			default:
+				throw new TypeError(`Unsupported MessagePack type 0x${type.toString(16)}`);
+		}
+	}
+}
+
+/**
+ * Decodes a single MessagePack value.
+ * @param bytes - Encoded value; must contain nothing after it
+ * @returns The decoded value
+ */
+export function decodeMsgpack(bytes: Uint8Array): any {
+	const reader = new Reader(bytes);
+	const value = reader.read();
+	if (!reader.done) {
+		throw new RangeError('Trailing bytes after MessagePack value');
+	}
+	return value;
+}
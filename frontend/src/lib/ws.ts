@@ -1,5 +1,21 @@
 // Simple WebSocket helper with auto-reconnect and heartbeat support.
 import { env } from '$env/dynamic/public';
+import { decodeMsgpack } from './msgpack';
+
+/** First byte of every header message, naming how its payload is encoded. */
+const FORMAT_JSON = 0x00;
+const FORMAT_MSGPACK = 0x01;
+const FORMAT_MSGPACK_DEFLATE = 0x02;
+
+/**
+ * Inflates a zlib ('deflate' format) payload
+ * @param bytes - Compressed payload
+ * @returns The decompressed bytes
+ */
+async function inflate(bytes: Uint8Array): Promise<Uint8Array> {
+	const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('deflate'));
+	return new Uint8Array(await new Response(stream).arrayBuffer());
+}
 
 export interface BinaryMessage {
 	json: any;
@@ -31,6 +47,19 @@ export class CanvasKitWebSocket {
 	private reconnectAttempts = 0;
 	private manualClose = false;
 	private onConnected?: () => void;
+	/** Header message still waiting for its trailing blob messages. */
+	private pendingMessage: { json: any; blobs: Blob[]; remaining: number } | null = null;
+	/**
+	 * Tail of the inbound processing chain. Compressed payloads inflate
+	 * asynchronously, so messages are handled one after another to keep order.
+	 */
+	private inbound: Promise<void> = Promise.resolve();
+	/**
+	 * Bumped whenever a socket closes or a new one opens. Queued inbound work
+	 * from an earlier generation is dropped, so messages from a closed socket
+	 * can't touch the state of the next connection.
+	 */
+	private generation = 0;
 
 	private readonly heartbeatIntervalMs: number;
 	private readonly reconnectDelayMs: number;
@@ -68,6 +97,8 @@ export class CanvasKitWebSocket {
 	}
 
 	private connect() {
+		this.generation += 1;
+		this.inbound = Promise.resolve();
 		this.ws = new WebSocket(this.url);
 		this.ws.binaryType = 'arraybuffer';
 		this.manualClose = false;
@@ -80,7 +111,11 @@ export class CanvasKitWebSocket {
 
 		this.ws.onmessage = (event) => {
 			if (event.data instanceof ArrayBuffer) {
-				this.handleBinaryMessage(event.data);
+				const buffer = event.data;
+				const generation = this.generation;
+				this.inbound = this.inbound
+					.then(() => this.handleBinaryMessage(buffer, generation))
+					.catch((e) => console.error('Failed to handle binary message', e));
 			} else {
 				// In case the server sends text frames unexpectedly
 				console.warn('Received text frame, expected binary', event.data);
@@ -92,7 +127,9 @@ export class CanvasKitWebSocket {
 		};
 
 		this.ws.onclose = () => {
+			this.generation += 1;
 			this.stopHeartbeat();
+			this.pendingMessage = null;
 
 			if (!this.manualClose) {
 				this.scheduleReconnect();
@@ -100,56 +137,94 @@ export class CanvasKitWebSocket {
 		};
 	}
 
-	private handleBinaryMessage(buffer: ArrayBuffer) {
+	private async handleBinaryMessage(buffer: ArrayBuffer, generation: number) {
+		if (generation !== this.generation) return;
+
+		// Blob messages follow their header message, one WebSocket message each,
+		// carrying nothing but the blob's raw bytes.
+		if (this.pendingMessage) {
+			const pending = this.pendingMessage;
+			pending.blobs.push(new Blob([buffer]));
+
+			pending.remaining -= 1;
+			if (pending.remaining === 0) {
+				this.pendingMessage = null;
+				this.dispatch({ json: pending.json, blobs: pending.blobs });
+			}
+			return;
+		}
+
+		// A message may carry several header frames back to back when the server
+		// coalesced a burst; each frame is self-delimiting.
 		const view = new DataView(buffer);
 		let offset = 0;
+		while (offset < view.byteLength) {
+			offset = await this.readHeaderFrame(buffer, view, offset, generation);
+			if (offset < 0) return;
+		}
+	}
 
-		// 1. Read JSON Length (4 bytes)
-		if (view.byteLength < 4) return;
-		const jsonLen = view.getUint32(offset, false); // big-endian
+	/**
+	 * Reads one header frame starting at `offset` and dispatches it.
+	 * @returns Offset just past the frame, or -1 if the rest of the message is unreadable or
+	 *   belongs to a connection that has since closed
+	 */
+	private async readHeaderFrame(
+		buffer: ArrayBuffer,
+		view: DataView,
+		offset: number,
+		generation: number
+	): Promise<number> {
+		// 1. Read Format Tag (1 byte) and Payload Length (4 bytes)
+		if (view.byteLength < offset + 5) return -1;
+		const format = view.getUint8(offset);
+		offset += 1;
+		const payloadLen = view.getUint32(offset, false); // big-endian
 		offset += 4;
 
-		// 2. Read JSON Payload
-		if (view.byteLength < offset + jsonLen) return;
-		const jsonBytes = new Uint8Array(buffer, offset, jsonLen);
-		offset += jsonLen;
+		// 2. Read Payload
+		if (view.byteLength < offset + payloadLen) return -1;
+		const payloadBytes = new Uint8Array(buffer, offset, payloadLen);
+		offset += payloadLen;
 
-		const textDecoder = new TextDecoder('utf-8');
-		const jsonStr = textDecoder.decode(jsonBytes);
+		// 3. Read Blob Count (4 bytes); the blobs arrive as the next messages
+		const blobCount = offset + 4 <= view.byteLength ? view.getUint32(offset, false) : 0;
+		offset += 4;
 
 		let jsonData: any;
 		try {
-			jsonData = JSON.parse(jsonStr);
+			if (format === FORMAT_MSGPACK) {
+				jsonData = decodeMsgpack(payloadBytes);
+			} else if (format === FORMAT_MSGPACK_DEFLATE) {
+				jsonData = decodeMsgpack(await inflate(payloadBytes));
+				// The socket may have closed while inflating
+				if (generation !== this.generation) return -1;
+			} else if (format === FORMAT_JSON) {
+				jsonData = JSON.parse(new TextDecoder('utf-8').decode(payloadBytes));
+			} else {
+				console.error(`Unknown payload format 0x${format.toString(16)} in binary message`);
+				return -1;
+			}
 		} catch (e) {
-			console.error('Failed to parse JSON from binary message', e);
-			return;
+			console.error('Failed to decode payload from binary message', e);
+			return offset;
 		}
 
 		// Handle heartbeat pong internally
 		if (jsonData && (jsonData === 'pong' || jsonData.event === 'pong')) {
-			return;
+			return offset;
 		}
 
-		// 3. Read Blobs
-		const blobs: Blob[] = [];
-		while (offset < view.byteLength) {
-			// Read Blob Length (4 bytes)
-			if (offset + 4 > view.byteLength) break;
-			const blobLen = view.getUint32(offset, false);
-			offset += 4;
-
-			// Read Blob Data
-			if (offset + blobLen > view.byteLength) break;
-			const blobData = buffer.slice(offset, offset + blobLen);
-			blobs.push(new Blob([blobData]));
-			offset += blobLen;
+		if (blobCount > 0) {
+			this.pendingMessage = { json: jsonData, blobs: [], remaining: blobCount };
+			return offset;
 		}
 
-		const message: BinaryMessage = {
-			json: jsonData,
-			blobs: blobs
-		};
+		this.dispatch({ json: jsonData, blobs: [] });
+		return offset;
+	}
 
+	private dispatch(message: BinaryMessage) {
 		this.listeners.forEach((listener) => listener(message));
 	}
 